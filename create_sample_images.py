@@ -3,12 +3,19 @@
 Create sample visualization images for README
 """
 
-import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 import numpy as np
 import os
 import plotly.graph_objects as go
 import plotly.io as pio
 
+try:
+    # Cairo rasterizes antialiased paths and text faster than Agg
+    from mplcairo.base import FigureCanvasCairo as FigureCanvas
+except ImportError:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+
 # Create screenshots directory if it doesn't exist
 os.makedirs('screenshots', exist_ok=True)
 
@@ -59,48 +66,52 @@ fig.update_layout(
 # Save as PNG
 pio.write_image(fig, 'screenshots/sankey_flow.png', scale=2, width=1000, height=600)
 
+# The remaining plots share a single figure, cleared between plots, so the
+# canvas and font setup only happen once
+fig = Figure(figsize=(10, 6))
+FigureCanvas(fig)
+ax = fig.subplots()
+
+# README-sized output; PIL's optimizer keeps the PNGs small
+save_options = dict(dpi=100, bbox_inches='tight', pil_kwargs={'optimize': True})
+
 # 2. Transaction Timeline
-plt.figure(figsize=(10, 6))
 sizes = np.random.rand(50) * 50 + 10
-plt.scatter(np.random.rand(50) * 12, np.random.rand(50) * 3, 
-           s=sizes, alpha=0.6, c=np.random.rand(50), cmap='viridis')
-plt.xlabel('Month')
-plt.ylabel('BTC Amount')
-plt.title('Transaction Timeline Example')
-plt.colorbar(label='Transaction Type')
-plt.tight_layout()
-plt.savefig('screenshots/transaction_timeline.png', dpi=300)
-plt.close()
+points = ax.scatter(np.random.rand(50) * 12, np.random.rand(50) * 3, 
+                    s=sizes, alpha=0.6, c=np.random.rand(50), cmap='viridis')
+ax.set_xlabel('Month')
+ax.set_ylabel('BTC Amount')
+ax.set_title('Transaction Timeline Example')
+colorbar = fig.colorbar(points, ax=ax, label='Transaction Type')
+fig.savefig('screenshots/transaction_timeline.png', **save_options)
+colorbar.remove()
+ax.clear()
 
 # 3. Wallet Balance Waterfall
-plt.figure(figsize=(10, 6))
-plt.fill_between(x, y1, label='Wallet A', alpha=0.7, color='#1f77b4')
-plt.fill_between(x, y2, label='Wallet B', alpha=0.7, color='#ff7f0e')
-plt.fill_between(x, y3, label='Wallet C', alpha=0.7, color='#2ca02c')
-plt.xlabel('Month')
-plt.ylabel('Balance (BTC)')
-plt.title('Wallet Balance Waterfall Example')
-plt.xticks(x, months)
-plt.legend()
-plt.tight_layout()
-plt.savefig('screenshots/wallet_balance_waterfall.png', dpi=300)
-plt.close()
+ax.fill_between(x, y1, label='Wallet A', alpha=0.7, color='#1f77b4')
+ax.fill_between(x, y2, label='Wallet B', alpha=0.7, color='#ff7f0e')
+ax.fill_between(x, y3, label='Wallet C', alpha=0.7, color='#2ca02c')
+ax.set_xlabel('Month')
+ax.set_ylabel('Balance (BTC)')
+ax.set_title('Wallet Balance Waterfall Example')
+ax.set_xticks(x, months)
+ax.legend()
+fig.savefig('screenshots/wallet_balance_waterfall.png', **save_options)
+ax.clear()
 
 # 4. Total Balance Chart
-plt.figure(figsize=(10, 6))
 total_balance = y1 + y2 + y3
-plt.plot(x, total_balance, 'o-', linewidth=2)
-plt.xlabel('Month')
-plt.ylabel('Total BTC Balance')
-plt.title('Total Bitcoin Balance Over Time')
-plt.xticks(x, months)
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.savefig('screenshots/total_balance.png', dpi=300)
-plt.close()
+ax.plot(x, total_balance, 'o-', linewidth=2)
+ax.set_xlabel('Month')
+ax.set_ylabel('Total BTC Balance')
+ax.set_title('Total Bitcoin Balance Over Time')
+ax.set_xticks(x, months)
+ax.grid(True, linestyle='--', alpha=0.7)
+fig.savefig('screenshots/total_balance.png', **save_options)
+ax.clear()
 
 # 5. Transaction Network
-plt.figure(figsize=(8, 6))
+fig.set_size_inches(8, 6)
 # Create a simple network diagram
 pos = {
     'A': (0, 1),
@@ -123,26 +134,28 @@ edges = [
 
 # Draw nodes
 for node, position in pos.items():
-    plt.scatter(position[0], position[1], s=800, alpha=0.8)
-    plt.text(position[0], position[1], labels[node], 
+    ax.scatter(position[0], position[1], s=800, alpha=0.8)
+    ax.text(position[0], position[1], labels[node], 
             horizontalalignment='center', verticalalignment='center')
 
-# Draw edges
-for edge in edges:
-    plt.arrow(pos[edge[0]][0], pos[edge[0]][1], 
-             pos[edge[1]][0] - pos[edge[0]][0], 
-             pos[edge[1]][1] - pos[edge[0]][1],
-             head_width=0.1, head_length=0.2, fc='black', ec='black',
-             length_includes_head=True, alpha=0.6, linewidth=edge[2])
-
-plt.title('Transaction Network Example')
-plt.axis('off')
-plt.tight_layout()
-plt.savefig('screenshots/transaction_network.png', dpi=300)
-plt.close()
+# Draw edges: all shafts as one line collection, all arrowheads as one quiver
+starts = np.array([pos[source] for source, _, _ in edges], dtype=float)
+ends = np.array([pos[target] for _, target, _ in edges], dtype=float)
+ax.add_collection(LineCollection(np.stack([starts, ends], axis=1),
+                                 linewidths=[weight for _, _, weight in edges],
+                                 colors='black', alpha=0.6))
+ax.quiver(starts[:, 0], starts[:, 1], ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1],
+          angles='xy', scale_units='xy', scale=1, width=0.002,
+          headwidth=24, headlength=40, headaxislength=36, color='black', alpha=0.6)
+
+ax.set_title('Transaction Network Example')
+ax.axis('off')
+fig.savefig('screenshots/transaction_network.png', **save_options)
+ax.clear()
+ax.axis('on')
 
 # 6. True Waterfall Chart (showing incremental balance changes)
-plt.figure(figsize=(10, 6))
+fig.set_size_inches(10, 6)
 
 # Create some example change data
 initial_balance = 5.0
@@ -157,35 +170,26 @@ bottoms = np.zeros(len(changes))
 bottoms[1:] = cumulative[:-1]  # Bottom of each bar is the previous cumulative value
 
 # Colors based on whether change is positive or negative
-colors = ['green' if x >= 0 else 'red' for x in changes]
+colors = np.where(changes >= 0, 'green', 'red')
 colors[0] = 'blue'  # Make initial balance blue
 
 # Create the bars
-plt.bar(x, changes, bottom=bottoms, color=colors, alpha=0.7)
+bars = ax.bar(x, changes, bottom=bottoms, color=colors, alpha=0.7)
 
 # Add a line showing cumulative balance
-plt.plot(x, cumulative, 'o-', color='black', linewidth=2)
+ax.plot(x, cumulative, 'o-', color='black', linewidth=2)
 
 # Add labels and styling
 labels = ['Starting Balance'] + [f'Change in {month}' for month in months[1:]]
-plt.xticks(x, labels, rotation=45, ha='right')
-plt.ylabel('Balance Change (BTC)')
-plt.title('Bitcoin Balance Waterfall Chart')
-
-# Annotate each bar with its value
-for i, (change, cum) in enumerate(zip(changes, cumulative)):
-    plt.annotate(f'{change:.2f}', xy=(i, bottoms[i] + max(0, change/2)),
-                 xytext=(0, 5), textcoords='offset points',
-                 ha='center', va='bottom')
-    
-    # Add cumulative value at each point
-    plt.annotate(f'{cum:.2f}', xy=(i, cum),
-                 xytext=(0, 10), textcoords='offset points',
-                 ha='center', va='bottom', fontweight='bold')
-
-plt.grid(axis='y', linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.savefig('screenshots/true_waterfall.png', dpi=300)
-plt.close()
+ax.set_xticks(x, labels, rotation=45, ha='right')
+ax.set_ylabel('Balance Change (BTC)')
+ax.set_title('Bitcoin Balance Waterfall Chart')
+
+# Annotate each bar with its change, and the cumulative value at the end of the bar
+ax.bar_label(bars, fmt='%.2f', label_type='center')
+ax.bar_label(bars, labels=[f'{cum:.2f}' for cum in cumulative], padding=5, fontweight='bold')
+
+ax.grid(axis='y', linestyle='--', alpha=0.7)
+fig.savefig('screenshots/true_waterfall.png', **save_options)
 
 print("Sample visualization images created in the screenshots directory") 
\ No newline at end of file
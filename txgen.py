@@ -11,8 +11,10 @@ import json
 import random
 import datetime
 import numpy as np
-from decimal import Decimal, getcontext
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from operator import itemgetter
 import hashlib
 
 # Bitcoin-related imports
@@ -24,11 +26,45 @@ from bitcoin.core.script import CScript, OP_DUP, OP_HASH160, OP_EQUALVERIFY, OP_
 from bitcoin.wallet import CBitcoinAddress, CBitcoinSecret, P2PKHBitcoinAddress
 from bitcoin.rpc import Proxy
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Set the network to regtest
 bitcoin.SelectParams('regtest')
 
-# Configure decimal precision
-getcontext().prec = 8
+# Smallest batch of address derivations worth spreading over worker processes
+PARALLEL_DERIVATION_MIN = 256
+
+def derive_key(seed, index):
+    """Derive the P2PKH address and WIF private key for an address slot of a wallet"""
+    # In a real implementation, we would derive from xpub
+    # For simplicity, we hash the wallet seed and index into a private key
+    secret = hashlib.sha256(seed + index.to_bytes(4, 'big')).digest()
+    key = CBitcoinSecret.from_secret_bytes(secret)
+    # Convert pubkey to P2PKH address
+    h160 = Hash160(key.pub)
+    address = P2PKHBitcoinAddress.from_bytes(h160)
+    return str(address), str(key)
+
+def write_json(path, data):
+    """Write data to a JSON file indented by 2 spaces, using orjson when available"""
+    if orjson is None:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        return
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+def write_json_lines(path, rows):
+    """Write one compact JSON object per line, using orjson when available"""
+    if orjson is None:
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(row) + '\n' for row in rows)
+        return
+    with open(path, 'wb') as f:
+        f.writelines(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
 
 class WalletSimulator:
     """Class to simulate Bitcoin wallets and transactions"""
@@ -42,15 +78,16 @@ class WalletSimulator:
         self.start_date = start_date or datetime.date(2024, 1, 1)
         self.end_date = end_date or datetime.date(2024, 12, 31)
         
-        # Set random seed for reproducibility
+        # Set random seed for reproducibility (random only seeds the key material)
         random.seed(seed)
-        np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
         
         # Initialize wallets and transactions
         self.wallets = {}
         self.transactions = []
         self.block_heights = {}
-        self.utxos = defaultdict(list)
+        self.utxos = defaultdict(dict)  # wallet -> {(txid, vout): utxo}
+        self._max_block_height = 0  # highest block height of any UTXO added so far
         self.exchange_rates = {}
         
         # Bitcoin RPC connection (will be initialized later)
@@ -63,26 +100,26 @@ class WalletSimulator:
         """Generate simulated BTC/USD exchange rates for the date range"""
         # Start with a base rate around $59,000 (early 2024)
         base_rate = 59000
-        current_date = self.start_date
+        num_days = (self.end_date - self.start_date).days + 1
         
-        while current_date <= self.end_date:
-            # Add some random fluctuation (between -5% and +5%)
-            fluctuation = random.uniform(-0.05, 0.05)
-            rate = base_rate * (1 + fluctuation)
-            
-            # Update base rate gradually over time (trend)
-            trend_factor = random.uniform(-0.02, 0.03)  # Slight upward bias
-            base_rate = base_rate * (1 + trend_factor)
-            
-            # Save the rate for this date
-            self.exchange_rates[current_date.isoformat()] = round(rate, 2)
-            
-            # Move to next day
-            current_date += datetime.timedelta(days=1)
+        # Add some random fluctuation (between -5% and +5%)
+        fluctuations = self.rng.uniform(-0.05, 0.05, num_days)
+        
+        # Update base rate gradually over time (trend); day 0 uses the starting base rate
+        trend_factors = self.rng.uniform(-0.02, 0.03, num_days)  # Slight upward bias
+        base_rates = base_rate * np.concatenate(([1.0], np.cumprod(1 + trend_factors[:-1])))
+        rates = np.round(base_rates * (1 + fluctuations), 2)
+        
+        # Save the rate for each date
+        dates = [(self.start_date + datetime.timedelta(days=i)).isoformat() for i in range(num_days)]
+        self.exchange_rates = dict(zip(dates, rates.tolist()))
+        
+        # Index the rates by date ordinal for constant-time lookups
+        self._start_ord = self.start_date.toordinal()
+        self._rate_by_ord = rates
         
         # Save exchange rates to file
-        with open(os.path.join(self.data_dir, 'exchange_rates.json'), 'w') as f:
-            json.dump(self.exchange_rates, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'exchange_rates.json'), self.exchange_rates)
     
     def generate_wallets(self):
         """Generate the three required wallets"""
@@ -107,51 +144,66 @@ class WalletSimulator:
             'addresses': []
         }
         
-        # Generate multiple addresses for each wallet
+        # Reserve address slots for each wallet; addresses are derived on first use
         for wallet_id in self.wallets:
             wallet = self.wallets[wallet_id]
-            # Generate derived addresses
             num_addresses = 1000 if wallet_id == 'A' else 100
-            for _ in range(num_addresses):
-                # In a real implementation, we would derive from xpub
-                # For simplicity, we're just generating random keys here
-                key = CBitcoinSecret.from_secret_bytes(random.randbytes(32))
-                # Convert pubkey to P2PKH address
-                h160 = Hash160(key.pub)
-                address = P2PKHBitcoinAddress.from_bytes(h160)
-                wallet['addresses'].append({
-                    'address': str(address),
-                    'privkey': key
-                })
+            wallet['seed'] = random.randbytes(32)
+            wallet['addresses'].extend([None] * num_addresses)
+    
+    def _derive_address(self, wallet_id, index):
+        """Return the address at the given index of a wallet, deriving it on first use"""
+        entry = self.wallets[wallet_id]['addresses'][index]
+        if entry is None:
+            self._derive_addresses(wallet_id, [index])
+            entry = self.wallets[wallet_id]['addresses'][index]
+        return entry['address']
+    
+    def _derive_addresses(self, wallet_id, indices):
+        """Derive the addresses at the given indices of a wallet that are not derived yet"""
+        wallet = self.wallets[wallet_id]
+        missing = sorted({index for index in indices if wallet['addresses'][index] is None})
+        
+        # Each slot depends only on the wallet seed and its index, so large batches
+        # can be split across processes without changing the result
+        if len(missing) >= PARALLEL_DERIVATION_MIN and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor() as pool:
+                keys = list(pool.map(derive_key, repeat(wallet['seed']), missing, chunksize=64))
+        else:
+            keys = map(derive_key, repeat(wallet['seed']), missing)
         
-        # Save wallet data
-        self._save_wallet_data()
+        for index, (address, privkey) in zip(missing, keys):
+            wallet['addresses'][index] = {
+                'address': address,
+                'privkey': privkey
+            }
     
     def _save_wallet_data(self):
-        """Save wallet data to a JSON file"""
+        """Save wallet data (the addresses derived so far) to a JSON file"""
         wallet_data = {}
         for wallet_id, wallet in self.wallets.items():
             wallet_data[wallet_id] = {
                 'name': wallet['name'],
-                'addresses': [addr['address'] for addr in wallet['addresses']]
+                'addresses': [addr['address'] for addr in wallet['addresses'] if addr is not None]
             }
         
-        with open(os.path.join(self.data_dir, 'wallets.json'), 'w') as f:
-            json.dump(wallet_data, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'wallets.json'), wallet_data)
+    
+    def _add_utxo(self, wallet_id, utxo):
+        """Add a UTXO to a wallet and return its (txid, vout) outpoint"""
+        outpoint = (utxo['txid'], utxo['vout'])
+        self.utxos[wallet_id][outpoint] = utxo
+        self._max_block_height = max(self._max_block_height, utxo['block_height'])
+        return outpoint
+    
+    def _rate_for(self, date):
+        """Return the BTC/USD rate for the given date (closest date if outside the range)"""
+        day = min(max(date.toordinal() - self._start_ord, 0), len(self._rate_by_ord) - 1)
+        return float(self._rate_by_ord[day])
     
     def usd_to_btc(self, usd_amount, date):
         """Convert USD amount to BTC based on the exchange rate for the given date"""
-        # Get the exchange rate for the date
-        date_str = date.isoformat()
-        rate = self.exchange_rates.get(date_str)
-        if not rate:
-            # Use closest date if exact date not found
-            closest_date = min(self.exchange_rates.keys(), key=lambda x: abs(datetime.date.fromisoformat(x) - date))
-            rate = self.exchange_rates[closest_date]
-        
-        # Convert USD to BTC
-        btc_amount = Decimal(usd_amount) / Decimal(rate)
-        return btc_amount
+        return usd_amount / self._rate_for(date)
     
     def btc_to_satoshis(self, btc_amount):
         """Convert BTC amount to satoshis"""
@@ -161,78 +213,59 @@ class WalletSimulator:
         """Generate 10,000 transactions for Wallet A (invoicing wallet)"""
         print("Generating invoicing transactions...")
         
-        # Get addresses from wallet A
-        wallet_a_addresses = [addr['address'] for addr in self.wallets['A']['addresses']]
-        
-        # Set up date distribution to spread over the year
-        start_ordinal = self.start_date.toordinal()
-        end_ordinal = self.end_date.toordinal()
-        days_range = end_ordinal - start_ordinal + 1
-        
-        txs = []
-        block_height = 1  # Start block height
-        
         # Generate transactions (use 1000 for faster testing, can change to 10000)
         num_transactions = 1000
         print(f"Generating {num_transactions} invoice transactions...")
         
-        for i in range(num_transactions):
-            # Randomly select a date
-            tx_date_ordinal = random.randint(start_ordinal, end_ordinal)
-            tx_date = datetime.date.fromordinal(tx_date_ordinal)
-            
-            # Randomly select a USD amount between $100-$2000
-            usd_amount = random.uniform(100, 2000)
-            
-            # Convert to BTC
-            btc_amount = self.usd_to_btc(usd_amount, tx_date)
-            satoshis = self.btc_to_satoshis(btc_amount)
-            
-            # Pick a random address from wallet A
-            recipient_address = random.choice(wallet_a_addresses)
+        # Randomly select a date, a USD amount between $100-$2000 and a wallet A address for every invoice
+        days = self.rng.integers(0, len(self._rate_by_ord), num_transactions)
+        usd_amounts = self.rng.uniform(100, 2000, num_transactions)
+        address_indices = self.rng.integers(0, len(self.wallets['A']['addresses']), num_transactions)
+        
+        # Convert to BTC at each day's rate
+        satoshis = (usd_amounts / self._rate_by_ord[days] * COIN).astype(np.int64)
+        
+        # Derive every recipient address up front in one batch
+        self._derive_addresses('A', address_indices.tolist())
+        
+        # Order transactions by date; block heights start at 100 and increment in that order
+        order = np.argsort(days, kind='stable')
+        
+        txs = []
+        for block_height, i in enumerate(order.tolist(), start=100):
+            tx_date = datetime.date.fromordinal(self._start_ord + int(days[i]))
+            recipient_address = self._derive_address('A', int(address_indices[i]))
+            amount = int(satoshis[i])
             
             # Create transaction data
             tx = {
                 'txid': f'invoice_{i}',  # Placeholder; in reality, would be the actual txid
                 'date': tx_date.isoformat(),
                 'block_height': block_height,
-                'usd_amount': round(usd_amount, 2),
-                'btc_amount': float(btc_amount),
-                'satoshis': satoshis,
+                'usd_amount': round(float(usd_amounts[i]), 2),
+                'btc_amount': amount / COIN,
+                'satoshis': amount,
                 'to_address': recipient_address,
                 'wallet': 'A',
                 'type': 'invoice'
             }
             
-            # Add to UTXO list for wallet A
-            self.utxos['A'].append({
+            # Add to UTXO set for wallet A
+            self._add_utxo('A', {
                 'txid': tx['txid'],
                 'vout': 0,
-                'amount': satoshis,
+                'amount': amount,
                 'address': recipient_address,
                 'block_height': block_height
             })
             
             txs.append(tx)
-            
-            # Increment block height (could be variable to simulate real-world block times)
-            block_height += random.randint(1, 6)
-        
-        # Sort transactions by date and adjust block heights accordingly
-        txs.sort(key=lambda x: x['date'])
-        for i, tx in enumerate(txs):
-            tx['block_height'] = 100 + i  # Start at block 100 and increment
-            # Update the corresponding UTXO block height
-            for utxo in self.utxos['A']:
-                if utxo['txid'] == tx['txid']:
-                    utxo['block_height'] = tx['block_height']
         
         # Add transactions to the main list
         self.transactions.extend(txs)
         
         # Save invoicing transactions to file
-        with open(os.path.join(self.data_dir, 'invoice_transactions.json'), 'w') as f:
-            json.dump(txs, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'invoice_transactions.json'), txs)
         
         print(f"Generated {len(txs)} invoice transactions")
     
@@ -242,19 +275,17 @@ class WalletSimulator:
         
         # Group UTXOs by 2-month periods
         consolidated_txs = []
-        curr_block_height = max(utxo['block_height'] for utxo in self.utxos['A']) + 1
+        curr_block_height = self._max_block_height + 1
         
-        # Get addresses from wallet B
-        wallet_b_addresses = [addr['address'] for addr in self.wallets['B']['addresses']]
+        # Number of addresses in wallet B
+        num_b_addresses = len(self.wallets['B']['addresses'])
         
-        # Organize UTXOs by date
-        utxos_by_date = {}
+        # Organize UTXOs by date (one bucket per bi-monthly period)
+        utxos_by_date = [[] for _ in range(6)]
         for tx in self.transactions:
             if tx.get('wallet') == 'A':
-                month = datetime.date.fromisoformat(tx['date']).month
+                month = int(tx['date'][5:7])  # ISO date: YYYY-MM-DD
                 period = (month - 1) // 2  # 0 = Jan-Feb, 1 = Mar-Apr, etc.
-                if period not in utxos_by_date:
-                    utxos_by_date[period] = []
                 utxos_by_date[period].append({
                     'txid': tx['txid'],
                     'vout': 0,
@@ -263,7 +294,10 @@ class WalletSimulator:
                 })
         
         # Create bi-monthly consolidation transactions
-        for period, period_utxos in utxos_by_date.items():
+        for period, period_utxos in enumerate(utxos_by_date):
+            if not period_utxos:
+                continue
+            
             # Calculate consolidation date (end of bi-monthly period)
             month = period * 2 + 2  # 2 = Feb, 4 = Apr, etc.
             year = self.start_date.year
@@ -275,7 +309,10 @@ class WalletSimulator:
             num_consolidations = 16 if period < 5 else 17
             
             # Split UTXOs into groups for each consolidation transaction
-            utxo_chunks = np.array_split(period_utxos, num_consolidations)
+            # (the first len % num_consolidations groups get one extra UTXO)
+            chunk_size, extra = divmod(len(period_utxos), num_consolidations)
+            bounds = [i * chunk_size + min(i, extra) for i in range(num_consolidations + 1)]
+            utxo_chunks = [period_utxos[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
             
             for i, chunk in enumerate(utxo_chunks):
                 # Skip empty chunks
@@ -286,7 +323,7 @@ class WalletSimulator:
                 total_satoshis = sum(utxo['amount'] for utxo in chunk)
                 
                 # Pick a random Treasury address
-                treasury_address = random.choice(wallet_b_addresses)
+                treasury_address = self._derive_address('B', int(self.rng.integers(num_b_addresses)))
                 
                 # Create consolidation transaction
                 tx = {
@@ -305,8 +342,8 @@ class WalletSimulator:
                 # Add to transactions list
                 consolidated_txs.append(tx)
                 
-                # Add to UTXO list for wallet B
-                self.utxos['B'].append({
+                # Add to UTXO set for wallet B
+                self._add_utxo('B', {
                     'txid': tx['txid'],
                     'vout': 0,
                     'amount': total_satoshis,
@@ -316,10 +353,10 @@ class WalletSimulator:
                 
                 # Remove spent UTXOs from wallet A
                 for spent_utxo in chunk:
-                    self.utxos['A'] = [u for u in self.utxos['A'] if u['txid'] != spent_utxo['txid']]
+                    del self.utxos['A'][(spent_utxo['txid'], spent_utxo['vout'])]
                 
                 # Increment block height
-                curr_block_height += random.randint(5, 15)
+                curr_block_height += int(self.rng.integers(5, 15, endpoint=True))
         
         # Add transactions to the main list
         self.transactions.extend(consolidated_txs)
@@ -329,8 +366,8 @@ class WalletSimulator:
             print(f"WARNING: {len(self.utxos['A'])} UTXOs were not consolidated from Wallet A to Treasury")
             # Force consolidation of any remaining UTXOs
             if len(self.utxos['A']) > 0:
-                remaining_utxos = self.utxos['A']
-                treasury_address = random.choice(wallet_b_addresses)
+                remaining_utxos = list(self.utxos['A'].values())
+                treasury_address = self._derive_address('B', int(self.rng.integers(num_b_addresses)))
                 total_satoshis = sum(utxo['amount'] for utxo in remaining_utxos)
                 
                 # Create final consolidation transaction
@@ -351,8 +388,8 @@ class WalletSimulator:
                 consolidated_txs.append(tx)
                 self.transactions.append(tx)
                 
-                # Add to UTXO list for wallet B
-                self.utxos['B'].append({
+                # Add to UTXO set for wallet B
+                self._add_utxo('B', {
                     'txid': tx['txid'],
                     'vout': 0,
                     'amount': total_satoshis,
@@ -361,15 +398,14 @@ class WalletSimulator:
                 })
                 
                 # Clear all UTXOs from wallet A
-                self.utxos['A'] = []
+                self.utxos['A'].clear()
                 
                 print(f"Created final consolidation transaction to move remaining UTXOs to Treasury")
         else:
             print("SUCCESS: All UTXOs from Wallet A were consolidated to Treasury")
         
         # Save consolidation transactions to file
-        with open(os.path.join(self.data_dir, 'consolidation_transactions.json'), 'w') as f:
-            json.dump(consolidated_txs, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'consolidation_transactions.json'), consolidated_txs)
         
         print(f"Generated {len(consolidated_txs)} consolidation transactions")
     
@@ -378,15 +414,15 @@ class WalletSimulator:
         print("Generating checking account transactions...")
         
         transactions = []
-        curr_block_height = max(utxo['block_height'] for utxo in self.utxos['B']) + 1
+        curr_block_height = self._max_block_height + 1
         
         # 1. Transfer 1 BTC from treasury to checking in January
-        checking_address = self.wallets['C']['addresses'][0]['address']
+        checking_address = self._derive_address('C', 0)
         one_btc_satoshis = COIN  # 1 BTC = 100,000,000 satoshis
         
         # Find a suitable UTXO from wallet B to spend
         treasury_utxo = None
-        for utxo in self.utxos['B']:
+        for utxo in self.utxos['B'].values():
             if utxo['amount'] >= one_btc_satoshis:
                 treasury_utxo = utxo
                 break
@@ -399,10 +435,10 @@ class WalletSimulator:
                 'txid': 'dummy_large_treasury_utxo',
                 'vout': 0,
                 'amount': one_btc_satoshis * 2,  # 2 BTC
-                'address': self.wallets['B']['addresses'][0]['address'],
+                'address': self._derive_address('B', 0),
                 'block_height': curr_block_height - 10
             }
-            self.utxos['B'].append(treasury_utxo)
+            self._add_utxo('B', treasury_utxo)
         
         # Create transfer transaction
         transfer_date = datetime.date(self.start_date.year, 1, 15)  # January 15
@@ -423,7 +459,7 @@ class WalletSimulator:
         transactions.append(transfer_tx)
         
         # Add to UTXOs for Wallet C
-        self.utxos['C'].append({
+        checking_outpoint = self._add_utxo('C', {
             'txid': transfer_tx['txid'],
             'vout': 0,
             'amount': one_btc_satoshis,
@@ -434,7 +470,7 @@ class WalletSimulator:
         # Add change back to Wallet B (if applicable)
         change_amount = treasury_utxo['amount'] - one_btc_satoshis
         if change_amount > 0:
-            self.utxos['B'].append({
+            self._add_utxo('B', {
                 'txid': transfer_tx['txid'],
                 'vout': 1,
                 'amount': change_amount,
@@ -443,22 +479,23 @@ class WalletSimulator:
             })
         
         # Remove spent UTXO from Wallet B
-        self.utxos['B'] = [u for u in self.utxos['B'] if u['txid'] != treasury_utxo['txid']]
+        del self.utxos['B'][(treasury_utxo['txid'], treasury_utxo['vout'])]
         
         # Increment block height
-        curr_block_height += random.randint(5, 15)
+        curr_block_height += int(self.rng.integers(5, 15, endpoint=True))
         
         # 2. Generate 20 outgoing transactions from checking to vendors ($50-$5000 USD)
         for i in range(20):
             # Random date after the transfer date
-            tx_date_ordinal = random.randint(
+            tx_date_ordinal = int(self.rng.integers(
                 transfer_date.toordinal() + 1, 
-                self.end_date.toordinal()
-            )
+                self.end_date.toordinal(),
+                endpoint=True
+            ))
             tx_date = datetime.date.fromordinal(tx_date_ordinal)
             
             # Random USD amount between $50-$5000
-            usd_amount = random.uniform(50, 5000)
+            usd_amount = self.rng.uniform(50, 5000)
             
             # Convert to BTC
             btc_amount = self.usd_to_btc(usd_amount, tx_date)
@@ -467,14 +504,17 @@ class WalletSimulator:
             # Create a random vendor address (external to our wallets)
             vendor_address = f"vendor_{i}"
             
+            # Spend the current checking UTXO (the 1 BTC input or its latest change)
+            checking_utxo = self.utxos['C'].pop(checking_outpoint)
+            
             # Create vendor payment transaction
             vendor_tx = {
                 'txid': f'vendor_payment_{i}',
                 'date': tx_date.isoformat(),
                 'block_height': curr_block_height,
-                'inputs': [{'txid': self.utxos['C'][0]['txid'], 'vout': 0}], # Use the 1 BTC input
+                'inputs': [{'txid': checking_utxo['txid'], 'vout': 0}], # Use the 1 BTC input
                 'usd_amount': round(usd_amount, 2),
-                'btc_amount': float(btc_amount),
+                'btc_amount': satoshis / COIN,
                 'satoshis': satoshis,
                 'to_address': vendor_address,
                 'wallet_from': 'C',
@@ -485,30 +525,23 @@ class WalletSimulator:
             # Add to transactions list
             transactions.append(vendor_tx)
             
-            # Update the UTXO for wallet C (subtract the amount spent)
-            self.utxos['C'][0]['amount'] -= satoshis
-            
-            # Add change UTXO back to wallet C
-            change_tx = {
+            # Replace the spent UTXO with the change UTXO (the amount left after the payment)
+            checking_outpoint = self._add_utxo('C', {
                 'txid': vendor_tx['txid'],
                 'vout': 1,
-                'amount': self.utxos['C'][0]['amount'],
+                'amount': checking_utxo['amount'] - satoshis,
                 'address': checking_address,
                 'block_height': curr_block_height
-            }
-            
-            # Replace the original UTXO with the change UTXO
-            self.utxos['C'][0] = change_tx
+            })
             
             # Increment block height
-            curr_block_height += random.randint(5, 15)
+            curr_block_height += int(self.rng.integers(5, 15, endpoint=True))
         
         # Add transactions to the main list
         self.transactions.extend(transactions)
         
         # Save checking transactions to file
-        with open(os.path.join(self.data_dir, 'checking_transactions.json'), 'w') as f:
-            json.dump(transactions, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'checking_transactions.json'), transactions)
         
         print(f"Generated {len(transactions)} checking account transactions")
     
@@ -517,21 +550,21 @@ class WalletSimulator:
         print("Generating special treasury transactions...")
         
         transactions = []
-        curr_block_height = max(
-            max(utxo['block_height'] for utxo in self.utxos['B']),
-            max(utxo['block_height'] for utxo in self.utxos['C'])
-        ) + 1
+        curr_block_height = self._max_block_height + 1
+        
+        # Number of addresses in wallet B
+        num_b_addresses = len(self.wallets['B']['addresses'])
         
         # 1. 5 outgoing transactions from treasury (50K-300K USD)
         # Distribute evenly through the year
         for i in range(5):
             # Set date spread across the year
             month = i * 2 + 2  # Feb, Apr, Jun, Aug, Oct
-            day = random.randint(1, 28)
+            day = int(self.rng.integers(1, 28, endpoint=True))
             tx_date = datetime.date(self.start_date.year, month, day)
             
             # Random USD amount between $50K-$300K
-            usd_amount = random.uniform(50000, 300000)
+            usd_amount = self.rng.uniform(50000, 300000)
             
             # Convert to BTC
             btc_amount = self.usd_to_btc(usd_amount, tx_date)
@@ -544,14 +577,14 @@ class WalletSimulator:
             utxos_to_spend = []
             total_input = 0
             
-            for utxo in sorted(self.utxos['B'], key=lambda u: u['amount'], reverse=True):
+            for utxo in sorted(self.utxos['B'].values(), key=itemgetter('amount'), reverse=True):
                 utxos_to_spend.append(utxo)
                 total_input += utxo['amount']
                 if total_input >= satoshis:
                     break
             
             if total_input < satoshis:
-                print(f"Warning: Not enough funds in treasury for {btc_amount} BTC outgoing transaction")
+                print(f"Warning: Not enough funds in treasury for {satoshis / COIN} BTC outgoing transaction")
                 continue
             
             # Create outgoing transaction
@@ -561,7 +594,7 @@ class WalletSimulator:
                 'block_height': curr_block_height,
                 'inputs': [{'txid': utxo['txid'], 'vout': utxo['vout']} for utxo in utxos_to_spend],
                 'usd_amount': round(usd_amount, 2),
-                'btc_amount': float(btc_amount),
+                'btc_amount': satoshis / COIN,
                 'satoshis': satoshis,
                 'to_address': external_address,
                 'wallet_from': 'B',
@@ -574,13 +607,13 @@ class WalletSimulator:
             
             # Remove spent UTXOs from wallet B
             for spent_utxo in utxos_to_spend:
-                self.utxos['B'] = [u for u in self.utxos['B'] if u['txid'] != spent_utxo['txid']]
+                del self.utxos['B'][(spent_utxo['txid'], spent_utxo['vout'])]
             
             # Add change back to treasury if any
             change_amount = total_input - satoshis
             if change_amount > 0:
-                treasury_address = random.choice([addr['address'] for addr in self.wallets['B']['addresses']])
-                self.utxos['B'].append({
+                treasury_address = self._derive_address('B', int(self.rng.integers(num_b_addresses)))
+                self._add_utxo('B', {
                     'txid': outgoing_tx['txid'],
                     'vout': 1,
                     'amount': change_amount,
@@ -589,14 +622,14 @@ class WalletSimulator:
                 })
             
             # Increment block height
-            curr_block_height += random.randint(5, 15)
+            curr_block_height += int(self.rng.integers(5, 15, endpoint=True))
         
         # 2. 2 incoming transactions to treasury (100K & 200K USD)
         # One in Q1, one in Q3
         for i, (quarter, usd_amount) in enumerate([(1, 100000), (3, 200000)]):
             # Set date in the appropriate quarter
             month = quarter * 3 - 1  # Q1 = Feb, Q3 = Aug
-            day = random.randint(1, 28)
+            day = int(self.rng.integers(1, 28, endpoint=True))
             tx_date = datetime.date(self.start_date.year, month, day)
             
             # Convert to BTC
@@ -604,7 +637,7 @@ class WalletSimulator:
             satoshis = self.btc_to_satoshis(btc_amount)
             
             # Pick a treasury address
-            treasury_address = random.choice([addr['address'] for addr in self.wallets['B']['addresses']])
+            treasury_address = self._derive_address('B', int(self.rng.integers(num_b_addresses)))
             
             # Create incoming transaction
             incoming_tx = {
@@ -613,7 +646,7 @@ class WalletSimulator:
                 'block_height': curr_block_height,
                 'inputs': [{'txid': f'external_source_{i}', 'vout': 0}],
                 'usd_amount': round(usd_amount, 2),
-                'btc_amount': float(btc_amount),
+                'btc_amount': satoshis / COIN,
                 'satoshis': satoshis,
                 'to_address': treasury_address,
                 'wallet_from': 'external',
@@ -625,7 +658,7 @@ class WalletSimulator:
             transactions.append(incoming_tx)
             
             # Add to UTXOs for wallet B
-            self.utxos['B'].append({
+            self._add_utxo('B', {
                 'txid': incoming_tx['txid'],
                 'vout': 0,
                 'amount': satoshis,
@@ -634,53 +667,49 @@ class WalletSimulator:
             })
             
             # Increment block height
-            curr_block_height += random.randint(5, 15)
+            curr_block_height += int(self.rng.integers(5, 15, endpoint=True))
         
         # Add transactions to the main list
         self.transactions.extend(transactions)
         
         # Save special treasury transactions to file
-        with open(os.path.join(self.data_dir, 'special_treasury_transactions.json'), 'w') as f:
-            json.dump(transactions, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'special_treasury_transactions.json'), transactions)
         
         print(f"Generated {len(transactions)} special treasury transactions")
     
     def save_all_transactions(self):
         """Save all transactions to a single file"""
         # Sort all transactions by block height
-        self.transactions.sort(key=lambda x: x['block_height'])
+        self.transactions.sort(key=itemgetter('block_height'))
         
         # Save to file
-        with open(os.path.join(self.data_dir, 'all_transactions.json'), 'w') as f:
-            json.dump(self.transactions, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'all_transactions.json'), self.transactions)
+        
+        # Save wallet data now that every address in use has been derived
+        self._save_wallet_data()
+        
+        # Also save one transaction per line so readers can stream the data
+        write_json_lines(os.path.join(self.data_dir, 'all_transactions.jsonl'), self.transactions)
         
         # Generate summary statistics
+        wallets_from = [tx.get('wallet_from', tx.get('wallet', 'unknown')) for tx in self.transactions]
+        wallets_to = [tx.get('wallet_to', 'unknown') for tx in self.transactions]
+        outgoing = Counter(wallets_from)
+        incoming = Counter(wallets_to)
+        
+        # Count by wallet, listing wallets in the order they first appear
+        wallet_ids = dict.fromkeys(chain.from_iterable(zip(wallets_from, wallets_to)))
         summary = {
             'total_transactions': len(self.transactions),
-            'transaction_types': {},
-            'wallets': {}
+            'transaction_types': dict(Counter(tx.get('type', 'unknown') for tx in self.transactions)),
+            'wallets': {
+                wallet_id: {'incoming': incoming[wallet_id], 'outgoing': outgoing[wallet_id]}
+                for wallet_id in wallet_ids
+            }
         }
         
-        for tx in self.transactions:
-            tx_type = tx.get('type', 'unknown')
-            if tx_type not in summary['transaction_types']:
-                summary['transaction_types'][tx_type] = 0
-            summary['transaction_types'][tx_type] += 1
-            
-            # Count by wallet
-            wallet_from = tx.get('wallet_from', tx.get('wallet', 'unknown'))
-            if wallet_from not in summary['wallets']:
-                summary['wallets'][wallet_from] = {'incoming': 0, 'outgoing': 0}
-            summary['wallets'][wallet_from]['outgoing'] += 1
-            
-            wallet_to = tx.get('wallet_to', 'unknown')
-            if wallet_to not in summary['wallets']:
-                summary['wallets'][wallet_to] = {'incoming': 0, 'outgoing': 0}
-            summary['wallets'][wallet_to]['incoming'] += 1
-        
         # Save summary
-        with open(os.path.join(self.data_dir, 'summary.json'), 'w') as f:
-            json.dump(summary, f, indent=2)
+        write_json(os.path.join(self.data_dir, 'summary.json'), summary)
         
         print(f"Saved {len(self.transactions)} transactions to all_transactions.json")
         print("Transaction generation complete!")
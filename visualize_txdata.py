@@ -6,28 +6,100 @@ Creates visualizations based on the generated transaction data from txgen.py
 """
 
 import os
-import json
-import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
+from itertools import islice
+
+try:
+    import orjson
+    # Serialize figures through orjson as well
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    # Fall back to the stdlib parser, which also accepts bytes
+    import json as orjson
+
+COIN = 100000000  # satoshis per BTC
+
+def read_json_lines(path, batch_size=10000):
+    """Read a JSON-Lines file into a DataFrame, parsing it in fixed-size batches"""
+    frames = []
+    with open(path, 'rb') as f:
+        while True:
+            batch = [orjson.loads(line) for line in islice(f, batch_size) if line.strip()]
+            if not batch:
+                break
+            frames.append(pd.DataFrame.from_records(batch))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 def load_transaction_data(data_dir='data'):
-    """Load the generated transaction data"""
-    with open(os.path.join(data_dir, 'all_transactions.json'), 'r') as f:
-        transactions = json.load(f)
+    """Load the generated transaction data as a normalized DataFrame"""
+    json_path = os.path.join(data_dir, 'all_transactions.json')
+    jsonl_path = os.path.join(data_dir, 'all_transactions.jsonl')
+    cache_path = os.path.join(data_dir, 'all_transactions.parquet')
+    
+    # Reuse the Parquet copy of the transactions unless the JSON has been regenerated since
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(json_path):
+        transactions = pd.read_parquet(cache_path)
+    else:
+        # Prefer streaming the JSON-Lines copy written alongside the JSON
+        if os.path.exists(jsonl_path) and os.path.getmtime(jsonl_path) >= os.path.getmtime(json_path):
+            transactions = read_json_lines(jsonl_path)
+        else:
+            with open(json_path, 'rb') as f:
+                transactions = pd.DataFrame(orjson.loads(f.read()))
+        try:
+            transactions.to_parquet(cache_path, compression='zstd')
+        except ImportError:
+            # No Parquet engine (pyarrow/fastparquet) installed; parse the JSON every time
+            pass
     print(f"Loaded {len(transactions)} transactions")
     
     # Load summary
-    with open(os.path.join(data_dir, 'summary.json'), 'r') as f:
-        summary = json.load(f)
+    with open(os.path.join(data_dir, 'summary.json'), 'rb') as f:
+        summary = orjson.loads(f.read())
     print(f"Transaction types: {summary['transaction_types']}")
     
-    return transactions, summary
+    return build_transaction_frame(transactions), summary
 
-def create_sankey_diagram(transactions, output_file='visualizations/sankey_flow.html'):
+def write_figure(fig, output_file):
+    """Write a figure to a standalone HTML file, skipping Plotly's property validation"""
+    if isinstance(fig, dict):
+        # Plain dict specs bypass go.Figure, which is what normally applies the default template
+        fig.setdefault('layout', {}).setdefault('template', pio.templates[pio.templates.default].to_plotly_json())
+    pio.write_html(fig, file=output_file, validate=False, include_plotlyjs='cdn', full_html=True)
+
+def build_transaction_frame(transactions):
+    """Normalize the raw transactions into a single DataFrame shared by all visualizations"""
+    df = pd.DataFrame(transactions)
+    
+    # Not every transaction type carries every field
+    for column in ('wallet', 'wallet_from', 'wallet_to', 'btc_amount', 'satoshis', 'usd_amount'):
+        if column not in df:
+            df[column] = np.nan
+    
+    # Invoices only record the wallet they were paid into
+    df['wallet_from'] = df['wallet_from'].fillna(df['wallet']).fillna('unknown')
+    df['wallet_to'] = df['wallet_to'].fillna('unknown')
+    
+    # Amounts are aggregated as exact integer satoshis; btc_amount is kept for display.
+    # Each one is derived from the other where missing, in a single pass over the arrays
+    btc = df['btc_amount'].to_numpy(dtype=np.float64)
+    satoshis = df['satoshis'].to_numpy(dtype=np.float64)
+    df['btc_amount'] = np.where(np.isnan(btc), np.nan_to_num(satoshis) / COIN, btc)
+    df['satoshis'] = np.where(np.isnan(satoshis), np.round(np.nan_to_num(btc) * COIN), satoshis).astype(np.int64)
+    
+    df['usd_amount'] = df['usd_amount'].fillna(0)
+    df['type'] = df['type'].fillna('unknown')
+    # The generator writes ISO-8601 dates; naming the format skips per-element inference
+    df['date'] = pd.to_datetime(df['date'], format='ISO8601', cache=True)
+    
+    return df[['date', 'block_height', 'type', 'wallet_from', 'wallet_to', 'satoshis', 'btc_amount', 'usd_amount']]
+
+def create_sankey_diagram(df, output_file='visualizations/sankey_flow.html'):
     """Create a Sankey diagram showing the flow of funds between wallets"""
     # Extract source, target, and value from transactions
     wallet_map = {
@@ -49,55 +121,30 @@ def create_sankey_diagram(transactions, output_file='visualizations/sankey_flow.
         'unknown': 'Unknown'
     }
     
+    # Transaction types with fixed endpoints; everything else (consolidations,
+    # transfers, ...) uses its own wallets with 'external' mapped to the
+    # matching in/out node
+    type_sources = {
+        'invoice': 'external_in',      # external_in -> A (invoicing wallet)
+        'treasury_incoming': 'A',      # typically A -> B
+        'treasury_outgoing': 'B'       # B -> external_out or B -> C
+    }
+    type_targets = {
+        'invoice': 'A',
+        'treasury_incoming': 'B',
+        'vendor_payment': 'external_out'  # C -> external_out
+    }
+    
     # Count flows between wallets
-    flows = {}
-    for tx in transactions:
-        # Get the transaction type
-        tx_type = tx.get('type', '')
-        
-        # Properly extract source and target based on transaction type
-        if tx_type == 'invoice':
-            # For invoices, external_in -> A (invoicing wallet)
-            source = 'external_in'
-            target = 'A'
-        elif tx_type == 'treasury_incoming':
-            # For treasury incoming, typically A -> B
-            source = 'A'
-            target = 'B'
-        elif tx_type == 'treasury_outgoing':
-            # For treasury outgoing, typically B -> external_out or B -> C
-            source = 'B'
-            target_orig = tx.get('wallet_to', 'external_out')
-            target = target_orig if target_orig != 'external' else 'external_out'
-        elif tx_type == 'consolidation':
-            # For consolidation, use the specified source and target
-            source_orig = tx.get('wallet_from', tx.get('wallet', 'unknown'))
-            source = source_orig if source_orig != 'external' else 'external_in'
-            target_orig = tx.get('wallet_to', 'unknown')
-            target = target_orig if target_orig != 'external' else 'external_out'
-        elif tx_type == 'vendor_payment':
-            # For vendor payments, typically from C to external_out
-            source = tx.get('wallet_from', 'C')
-            target = 'external_out'
-        else:
-            # For other transactions, use the specified source and target but map external
-            source_orig = tx.get('wallet_from', tx.get('wallet', 'unknown'))
-            source = source_orig if source_orig != 'external' else 'external_in'
-            target_orig = tx.get('wallet_to', 'unknown')
-            target = target_orig if target_orig != 'external' else 'external_out'
-        
-        # Get the amount
-        amount = tx.get('btc_amount', tx.get('satoshis', 0) / 100000000)
-        
-        # Skip if source or target is unknown or not in our wallet map
-        if source not in wallet_map or target not in wallet_map:
-            continue
-        
-        flow_key = (source, target)
-        if flow_key in flows:
-            flows[flow_key] += amount
-        else:
-            flows[flow_key] = amount
+    endpoints = pd.DataFrame({
+        'source': df['type'].map(type_sources).fillna(df['wallet_from'].replace({'external': 'external_in'})),
+        'target': df['type'].map(type_targets).fillna(df['wallet_to'].replace({'external': 'external_out'})),
+        'satoshis': df['satoshis']
+    })
+    
+    # Skip if source or target is unknown or not in our wallet map
+    endpoints = endpoints[endpoints['source'].isin(wallet_map) & endpoints['target'].isin(wallet_map)]
+    flows = endpoints.groupby(['source', 'target'], sort=False)['satoshis'].sum() / COIN
     
     # Create source, target, and value arrays for Sankey
     sources = []
@@ -115,144 +162,111 @@ def create_sankey_diagram(transactions, output_file='visualizations/sankey_flow.
     nodes = ['Invoicing Wallet', 'Treasury Wallet', 'Checking Wallet', 'External Sources', 'External Destinations']
     node_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
     
-    # Create Sankey diagram
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=15,
-            thickness=20,
-            line=dict(color="black", width=0.5),
-            label=nodes,
-            color=node_colors
-        ),
-        link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            label=labels,
-            color=['rgba(31, 119, 180, 0.4)'] * len(sources)  # Blue with transparency
-        )
-    )])
-    
-    fig.update_layout(
-        title_text="Bitcoin Flow Between Wallets (Actual Data)",
-        font_size=12
-    )
+    # Create Sankey diagram as a plain figure spec (no go.Figure object tree to build and validate)
+    spec = {
+        'data': [{
+            'type': 'sankey',
+            'node': {
+                'pad': 15,
+                'thickness': 20,
+                'line': {'color': "black", 'width': 0.5},
+                'label': nodes,
+                'color': node_colors
+            },
+            'link': {
+                'source': sources,
+                'target': targets,
+                'value': values,
+                'label': labels,
+                'color': ['rgba(31, 119, 180, 0.4)'] * len(sources)  # Blue with transparency
+            }
+        }],
+        'layout': {
+            'title': {'text': "Bitcoin Flow Between Wallets (Actual Data)"},
+            'font': {'size': 12}
+        }
+    }
     
     # Save to HTML file
-    fig.write_html(output_file)
+    write_figure(spec, output_file)
     print(f"Sankey diagram saved to {output_file}")
-    return fig
+    return spec
 
-def create_transaction_timeline(transactions, output_file='visualizations/transaction_timeline.html'):
+def create_transaction_timeline(df, output_file='visualizations/transaction_timeline.html', max_points=10000):
     """Create a timeline visualization of transactions"""
-    # Extract data for timeline
-    df_data = []
-    
-    for tx in transactions:
-        df_data.append({
-            'date': tx.get('date', ''),
-            'block_height': tx.get('block_height', 0),
-            'type': tx.get('type', 'unknown'),
-            'from': tx.get('wallet_from', tx.get('wallet', 'unknown')),
-            'to': tx.get('wallet_to', 'unknown'),
-            'amount_btc': tx.get('btc_amount', tx.get('satoshis', 0) / 100000000),
-            'amount_usd': tx.get('usd_amount', 0)
-        })
-    
-    df = pd.DataFrame(df_data)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Create a timeline visualization
+    # Use the column names shown in the hover labels
+    df = df.rename(columns={
+        'wallet_from': 'from',
+        'wallet_to': 'to',
+        'btc_amount': 'amount_btc',
+        'usd_amount': 'amount_usd'
+    })
+    size = 'amount_btc'
+    hover_data = ['from', 'to', 'block_height', 'amount_usd']
+    
+    # Too many points to plot individually: show daily totals per transaction type instead
+    if len(df) > max_points:
+        df = df.groupby([pd.Grouper(key='date', freq='1D'), 'type']).agg(
+            amount_btc=('amount_btc', 'sum'),
+            amount_usd=('amount_usd', 'sum'),
+            count=('amount_btc', 'size')
+        ).reset_index()
+        size = 'count'
+        hover_data = ['count', 'amount_usd']
+    
+    # Create a timeline visualization (WebGL renders large point counts far better than SVG)
     fig = px.scatter(
         df, 
         x='date', 
         y='amount_btc',
         color='type',
-        size='amount_btc',
-        hover_data=['from', 'to', 'block_height', 'amount_usd'],
+        size=size,
+        hover_data=hover_data,
         title='Transaction Timeline (Actual Data)',
-        labels={'amount_btc': 'Amount (BTC)', 'date': 'Date', 'type': 'Transaction Type'}
+        labels={'amount_btc': 'Amount (BTC)', 'date': 'Date', 'type': 'Transaction Type'},
+        render_mode='webgl'
     )
     
     fig.update_layout(height=600)
-    fig.write_html(output_file)
+    write_figure(fig, output_file)
     
     print(f"Transaction timeline saved to {output_file}")
     return fig
 
-def create_wallet_balance_waterfall(transactions, output_file='visualizations/wallet_balance_waterfall.html'):
+def create_wallet_balance_waterfall(df, output_file='visualizations/wallet_balance_waterfall.html'):
     """Create a waterfall chart showing wallet balances over time"""
     # Sort transactions by date and block height
-    sorted_txs = sorted(transactions, key=lambda x: (x.get('date', ''), x.get('block_height', 0)))
-    
-    # Track balances over time
-    balances = {'A': [], 'B': [], 'C': []}
-    dates = []
-    block_heights = []
-    current_balances = {'A': 0, 'B': 0, 'C': 0}
-    
-    for tx in sorted_txs:
-        source = tx.get('wallet_from', tx.get('wallet', 'unknown'))
-        target = tx.get('wallet_to', 'unknown')
-        amount = tx.get('btc_amount', tx.get('satoshis', 0) / 100000000)
-        date = tx.get('date', '')
-        block_height = tx.get('block_height', 0)
-        
-        # Update balances based on transaction
-        if source in current_balances:
-            current_balances[source] -= amount
-        
-        if target in current_balances:
-            current_balances[target] += amount
-        
-        # Save the state
-        for wallet in current_balances:
-            balances[wallet].append(current_balances[wallet])
-        
-        dates.append(date)
-        block_heights.append(block_height)
-    
-    # Create DataFrame for plotting
-    df_data = {
-        'date': pd.to_datetime(dates),
-        'block_height': block_heights
-    }
-    
-    for wallet in balances:
-        df_data[f'Wallet {wallet}'] = balances[wallet]
-    
-    df = pd.DataFrame(df_data)
-    
-    # Group by date and get the last balance for each day (to avoid duplicate dates issue)
-    df = df.sort_values(['date', 'block_height'])
+    sorted_df = df.sort_values(['date', 'block_height'])
+    amounts = sorted_df['satoshis'].to_numpy()
+    
+    # Running balance per wallet: credit incoming, debit outgoing, then accumulate
+    wallets = ('A', 'B', 'C')
+    balances = sorted_df[['date', 'block_height']].reset_index(drop=True)
+    total_satoshis = np.zeros(len(sorted_df), dtype=np.int64)
+    for wallet in wallets:
+        delta = (np.where(sorted_df['wallet_to'] == wallet, amounts, 0)
+                 - np.where(sorted_df['wallet_from'] == wallet, amounts, 0))
+        wallet_satoshis = np.cumsum(delta)
+        total_satoshis += wallet_satoshis
+        balances[f'Wallet {wallet}'] = wallet_satoshis / COIN
     
     # Create stacked area chart
     fig = px.area(
-        df, 
+        balances, 
         x='date', 
-        y=[f'Wallet {w}' for w in balances.keys()],
+        y=[f'Wallet {w}' for w in wallets],
         title='Wallet Balances Over Time (Actual Data)',
         labels={'value': 'Balance (BTC)', 'date': 'Date', 'variable': 'Wallet'}
     )
     
     fig.update_layout(height=600)
-    fig.write_html(output_file)
+    write_figure(fig, output_file)
     
     print(f"Wallet balance waterfall saved to {output_file}")
     
     # Also create a cumulative balance chart
-    total_balance = []
-    for i in range(len(dates)):
-        total = sum(balances[wallet][i] for wallet in balances)
-        total_balance.append(total)
-    
-    df_total = pd.DataFrame({
-        'date': pd.to_datetime(dates),
-        'block_height': block_heights,
-        'total_balance': total_balance
-    })
-    
-    df_total = df_total.sort_values(['date', 'block_height'])
+    df_total = balances[['date', 'block_height']].copy()
+    df_total['total_balance'] = total_satoshis / COIN
     
     fig_total = px.line(
         df_total,
@@ -263,40 +277,22 @@ def create_wallet_balance_waterfall(transactions, output_file='visualizations/wa
     )
     
     total_output_file = output_file.replace('wallet_balance_waterfall', 'total_balance')
-    fig_total.write_html(total_output_file)
+    write_figure(fig_total, total_output_file)
     print(f"Total balance chart saved to {total_output_file}")
     
     return fig
 
-def create_transaction_network(transactions, output_file='visualizations/transaction_network.html'):
+def create_transaction_network(df, output_file='visualizations/transaction_network.html'):
     """Create a network graph visualization of transactions"""
-    import networkx as nx
-    
-    # Create a directed graph
-    G = nx.DiGraph()
-    
-    # Add nodes for all wallets and external entities
+    # Nodes for all wallets and external entities
     wallet_nodes = {'A': 'Invoicing', 'B': 'Treasury', 'C': 'Checking', 'external': 'External'}
-    for wallet_id, name in wallet_nodes.items():
-        G.add_node(wallet_id, label=name, size=30)
-    
-    # Add transaction edges
-    for tx in transactions:
-        source = tx.get('wallet_from', tx.get('wallet', 'unknown'))
-        target = tx.get('wallet_to', 'unknown')
-        tx_type = tx.get('type', 'unknown')
-        amount = tx.get('btc_amount', tx.get('satoshis', 0) / 100000000)
-        
-        # Skip if source or target is unknown or not in our wallet nodes
-        if source not in wallet_nodes or target not in wallet_nodes:
-            continue
-        
-        # Add or update edge
-        if G.has_edge(source, target):
-            G[source][target]['weight'] += amount
-            G[source][target]['count'] += 1
-        else:
-            G.add_edge(source, target, weight=amount, count=1, type=tx_type)
+    
+    # Aggregate transactions into weighted edges, skipping unknown sources or targets
+    known = df['wallet_from'].isin(wallet_nodes) & df['wallet_to'].isin(wallet_nodes)
+    edges = df[known].groupby(['wallet_from', 'wallet_to']).agg(
+        satoshis=('satoshis', 'sum'),
+        count=('satoshis', 'size')
+    ).reset_index()
     
     # Convert to a format Plotly can use
     edge_x = []
@@ -310,10 +306,9 @@ def create_transaction_network(transactions, output_file='visualizations/transac
         'external': (1, 2)
     }
     
-    for edge in G.edges(data=True):
-        source, target, data = edge
-        x0, y0 = pos[source]
-        x1, y1 = pos[target]
+    for edge in edges.itertuples():
+        x0, y0 = pos[edge.wallet_from]
+        x1, y1 = pos[edge.wallet_to]
         
         # Add curved edges
         edge_x.append(x0)
@@ -323,156 +318,110 @@ def create_transaction_network(transactions, output_file='visualizations/transac
         edge_y.append(y1)
         edge_y.append(None)
         
-        edge_text.append(f"{data['weight']:.8f} BTC ({data['count']} transactions)")
-    
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
-        line=dict(width=1, color='#888'),
-        hoverinfo='text',
-        text=edge_text,
-        mode='lines'
-    )
+        edge_text.append(f"{edge.satoshis / COIN:.8f} BTC ({edge.count} transactions)")
+    
+    edge_trace = {
+        'type': 'scattergl',
+        'x': edge_x, 'y': edge_y,
+        'line': {'width': 1, 'color': '#888'},
+        'hoverinfo': 'text',
+        'text': edge_text,
+        'mode': 'lines'
+    }
     
     node_x = []
     node_y = []
     node_text = []
     
+    # Total volume flowing in and out of each node
+    node_totals = edges.groupby('wallet_from')['satoshis'].sum().add(
+        edges.groupby('wallet_to')['satoshis'].sum(), fill_value=0
+    ).reindex(list(wallet_nodes), fill_value=0) / COIN
+    
     # Calculate node sizes based on transaction volume
     node_sizes = []
-    for node in G.nodes():
+    for node in wallet_nodes:
         x, y = pos[node]
         node_x.append(x)
         node_y.append(y)
         node_text.append(f"{wallet_nodes[node]} Wallet")
-        
-        # Calculate node size based on transaction volume
-        total_in = sum(data['weight'] for u, v, data in G.in_edges(node, data=True) if u in wallet_nodes)
-        total_out = sum(data['weight'] for u, v, data in G.out_edges(node, data=True) if v in wallet_nodes)
-        node_sizes.append(30 + 10 * (total_in + total_out))  # Base size + volume-based increase
-    
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        text=[wallet_nodes[node] for node in G.nodes()],
-        textposition="top center",
-        hoverinfo='text',
-        marker=dict(
-            showscale=True,
-            colorscale='YlGnBu',
-            size=node_sizes,
-            color=[i for i in range(len(node_sizes))],  # Color by index
-            colorbar=dict(
-                thickness=15,
-                title='Node Index'
-            ),
-            line_width=2
-        )
-    )
+        node_sizes.append(30 + 10 * float(node_totals[node]))  # Base size + volume-based increase
+    
+    node_trace = {
+        'type': 'scattergl',
+        'x': node_x, 'y': node_y,
+        'mode': 'markers+text',
+        'text': list(wallet_nodes.values()),
+        'textposition': "top center",
+        'hoverinfo': 'text',
+        'marker': {
+            'showscale': True,
+            'colorscale': 'YlGnBu',
+            'size': node_sizes,
+            'color': [i for i in range(len(node_sizes))],  # Color by index
+            'colorbar': {
+                'thickness': 15,
+                'title': {'text': 'Node Index'}
+            },
+            'line': {'width': 2}
+        }
+    }
+    
+    # Create figure spec
+    spec = {
+        'data': [edge_trace, node_trace],
+        'layout': {
+            'title': {'text': 'Transaction Network (Actual Data)'},
+            'showlegend': False,
+            'hovermode': 'closest',
+            'margin': {'b': 20, 'l': 5, 'r': 5, 't': 40},
+            'xaxis': {'showgrid': False, 'zeroline': False, 'showticklabels': False},
+            'yaxis': {'showgrid': False, 'zeroline': False, 'showticklabels': False}
+        }
+    }
     
-    # Create figure
-    fig = go.Figure(data=[edge_trace, node_trace],
-                  layout=go.Layout(
-                      title='Transaction Network (Actual Data)',
-                      showlegend=False,
-                      hovermode='closest',
-                      margin=dict(b=20, l=5, r=5, t=40),
-                      xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                      yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
-                  ))
-    
-    fig.write_html(output_file)
+    write_figure(spec, output_file)
     print(f"Transaction network visualization saved to {output_file}")
-    return fig
+    return spec
 
-def create_true_waterfall(transactions, output_file='visualizations/true_waterfall.html'):
+def create_true_waterfall(df, output_file='visualizations/true_waterfall.html'):
     """Create a waterfall chart showing balance changes over time"""
-    # Group transactions by month
-    tx_by_month = {}
-    
-    for tx in transactions:
-        date = tx.get('date', '')
-        if not date:
-            continue
-        
-        # Extract year and month
-        year_month = date[:7]  # Gets "YYYY-MM" part
-        
-        if year_month not in tx_by_month:
-            tx_by_month[year_month] = []
-        
-        tx_by_month[year_month].append(tx)
-    
-    # Calculate net change per month
-    months = sorted(tx_by_month.keys())
-    net_changes = []
+    # Net inflows (external to our system) minus outflows for each month
+    months = df['date'].dt.to_period('M')
+    inflow = df['satoshis'].where(df['wallet_from'] == 'external', 0).groupby(months).sum()
+    outflow = df['satoshis'].where(df['wallet_to'] == 'external', 0).groupby(months).sum()
+    net = (inflow - outflow).sort_index() / COIN
     
     # Start with zero (conceptually the balance before transactions)
-    total_balance = 0
-    data = []
-    
-    # Add starting balance entry
-    data.append({
-        'month': 'Start',
-        'change': 0,
-        'balance': 0,
-        'type': 'start'
-    })
-    
-    # Calculate net changes for each month
-    for month in months:
-        txs = tx_by_month[month]
-        
-        # Calculate net inflows (external to our system) and outflows
-        inflow = sum(tx.get('btc_amount', tx.get('satoshis', 0) / 100000000) 
-                    for tx in txs 
-                    if tx.get('wallet_from') == 'external')
-        
-        outflow = sum(tx.get('btc_amount', tx.get('satoshis', 0) / 100000000) 
-                     for tx in txs 
-                     if tx.get('wallet_to') == 'external')
-        
-        # Net change for the month
-        net_change = inflow - outflow
-        total_balance += net_change
-        
-        data.append({
-            'month': month,
-            'change': net_change,
-            'balance': total_balance,
-            'type': 'increase' if net_change >= 0 else 'decrease'
-        })
-    
-    # Create a dataframe
-    df = pd.DataFrame(data)
-    
-    # Set colors based on increase/decrease
-    colors = ['blue' if x == 'start' else ('green' if x == 'increase' else 'red') 
-             for x in df['type']]
-    
-    # Create the waterfall chart
-    fig = go.Figure(go.Waterfall(
-        name="Bitcoin Balance", 
-        orientation="v",
-        measure=["absolute"] + ["relative"] * (len(df) - 1),
-        x=df['month'],
-        textposition="outside",
-        text=[f"{val:.4f}" for val in df['change']],
-        y=df['change'],
-        connector={"line": {"color": "rgb(63, 63, 63)"}},
-        increasing={"marker": {"color": "green"}},
-        decreasing={"marker": {"color": "red"}},
-        totals={"marker": {"color": "blue"}}
-    ))
-    
-    fig.update_layout(
-        title="Bitcoin Balance Waterfall Chart (Actual Data)",
-        yaxis_title="BTC",
-        showlegend=False
-    )
+    labels = ['Start'] + net.index.astype(str).tolist()
+    changes = np.concatenate(([0], net.to_numpy()))
+    
+    # Create the waterfall chart spec
+    spec = {
+        'data': [{
+            'type': 'waterfall',
+            'name': "Bitcoin Balance",
+            'orientation': "v",
+            'measure': ["absolute"] + ["relative"] * len(net),
+            'x': labels,
+            'textposition': "outside",
+            'text': [f"{val:.4f}" for val in changes],
+            'y': changes.tolist(),
+            'connector': {"line": {"color": "rgb(63, 63, 63)"}},
+            'increasing': {"marker": {"color": "green"}},
+            'decreasing': {"marker": {"color": "red"}},
+            'totals': {"marker": {"color": "blue"}}
+        }],
+        'layout': {
+            'title': {'text': "Bitcoin Balance Waterfall Chart (Actual Data)"},
+            'yaxis': {'title': {'text': "BTC"}},
+            'showlegend': False
+        }
+    }
     
-    fig.write_html(output_file)
+    write_figure(spec, output_file)
     print(f"True waterfall chart saved to {output_file}")
-    return fig
+    return spec
 
 def main():
     """Main function to create all visualizations"""
@@ -480,17 +429,17 @@ def main():
     print("-------------------------------------")
     
     # Load transaction data
-    transactions, summary = load_transaction_data()
+    df, summary = load_transaction_data()
     
     # Create directory for visualizations
     os.makedirs('visualizations', exist_ok=True)
     
     # Create various visualizations
-    create_sankey_diagram(transactions)
-    create_transaction_timeline(transactions)
-    create_wallet_balance_waterfall(transactions)
-    create_transaction_network(transactions)
-    create_true_waterfall(transactions)
+    create_sankey_diagram(df)
+    create_transaction_timeline(df)
+    create_wallet_balance_waterfall(df)
+    create_transaction_network(df)
+    create_true_waterfall(df)
     
     print("\nAll visualizations have been created in the 'visualizations' directory.")
 